@@ -0,0 +1,16 @@
+"""
+Celery configuration for ocr_deepl_translator project.
+
+OCR and translation run as Celery tasks so they do not block a web
+worker. Settings prefixed with CELERY_ in settings.py configure the app.
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ocr_deepl_translator.settings')
+
+app = Celery('ocr_deepl_translator')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
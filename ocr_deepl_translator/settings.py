@@ -38,6 +38,21 @@ TESSERACT_CMD = os.getenv('TESSERACT_CMD', 'tesseract')
 # DeepL API settings
 DEEPL_API_KEY = os.getenv('DEEPL_API_KEY')
 
+# Celery settings
+# OCR is CPU-bound and translation is network-bound, so they use separate
+# queues served by differently sized worker pools. Tasks run inline when
+# CELERY_TASK_ALWAYS_EAGER is True, so development needs no broker.
+CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', 'redis://localhost:6379/0')
+CELERY_TASK_ALWAYS_EAGER = os.getenv('CELERY_TASK_ALWAYS_EAGER', 'True') == 'True'
+CELERY_TASK_ROUTES = {
+    'translator.tasks.run_ocr': {'queue': 'ocr'},
+    'translator.tasks.run_translate': {'queue': 'translate'},
+}
+
+# Seconds an OCR task may run before it is stopped and marked failed.
+# A document still processing well after this can be OCR'd again.
+OCR_TIME_LIMIT = int(os.getenv('OCR_TIME_LIMIT', 30 * 60))
+
 
 # Application definition
 
@@ -67,19 +82,28 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            # Parse each template once per process, in development as well
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
         },
     },
 ]
 
 WSGI_APPLICATION = 'ocr_deepl_translator.wsgi.application'
 
+# Keep flash messages in a signed cookie so they never touch the session store
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
@@ -92,6 +116,20 @@ DATABASES = {
 }
 
 
+# Cache
+# Translations are cached by text and language pair. Set CACHE_URL to a
+# Redis URL to share the cache between web and Celery worker processes;
+# otherwise each process uses its own local memory cache.
+CACHE_URL = os.getenv('CACHE_URL')
+if CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -11,19 +11,26 @@ class DocumentAdmin(admin.ModelAdmin):
 @admin.register(OCRResult)
 class OCRResultAdmin(admin.ModelAdmin):
     list_display = ('document', 'language', 'created_at')
+    list_select_related = ('document',)
     list_filter = ('language', 'created_at')
     search_fields = ('document__title', 'text')
     readonly_fields = ('created_at',)
 
 @admin.register(Translation)
 class TranslationAdmin(admin.ModelAdmin):
-    list_display = ('ocr_result', 'source_language', 'target_language', 'created_at')
-    list_filter = ('source_language', 'target_language', 'created_at')
+    list_display = ('ocr_result', 'source_language', 'target_language', 'status', 'created_at')
+    list_filter = ('status', 'source_language', 'target_language', 'created_at')
     search_fields = ('ocr_result__document__title', 'text')
     readonly_fields = ('created_at',)
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('ocr_result__document')
+
 @admin.register(OutputFile)
 class OutputFileAdmin(admin.ModelAdmin):
     list_display = ('translation', 'file_type', 'created_at')
     list_filter = ('file_type', 'created_at')
     readonly_fields = ('created_at',)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('translation')
@@ -1,6 +1,14 @@
+import os
+
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class TranslatorConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'translator'
+
+    def ready(self):
+        # Create the output directory once per process rather than on
+        # every output file request
+        os.makedirs(os.path.join(settings.MEDIA_ROOT, 'outputs'), exist_ok=True)
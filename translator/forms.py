@@ -1,6 +1,63 @@
+import hashlib
+import os
 from django import forms
 from .models import Document, OCRResult, Translation
 
+# Common languages supported by Tesseract
+OCR_LANGUAGE_CHOICES = (
+    ('eng', 'English'),
+    ('fra', 'French'),
+    ('deu', 'German'),
+    ('spa', 'Spanish'),
+    ('ita', 'Italian'),
+    ('por', 'Portuguese'),
+    ('rus', 'Russian'),
+    ('jpn', 'Japanese'),
+    ('chi_sim', 'Chinese Simplified'),
+    ('chi_tra', 'Chinese Traditional'),
+    ('kor', 'Korean'),
+    ('ara', 'Arabic'),
+    ('hin', 'Hindi'),
+    ('vie', 'Vietnamese'),
+    ('nld', 'Dutch'),
+    ('swe', 'Swedish'),
+    ('fin', 'Finnish'),
+    ('pol', 'Polish'),
+    ('tur', 'Turkish'),
+    ('ell', 'Greek'),
+    ('heb', 'Hebrew'),
+)
+
+# Languages supported by DeepL
+DEEPL_LANGUAGE_CHOICES = (
+    ('EN-US', 'English (American)'),
+    ('EN-GB', 'English (British)'),
+    ('FR', 'French'),
+    ('DE', 'German'),
+    ('ES', 'Spanish'),
+    ('IT', 'Italian'),
+    ('PT-PT', 'Portuguese'),
+    ('PT-BR', 'Portuguese (Brazilian)'),
+    ('RU', 'Russian'),
+    ('JA', 'Japanese'),
+    ('ZH', 'Chinese (simplified)'),
+    ('NL', 'Dutch'),
+    ('PL', 'Polish'),
+    ('BG', 'Bulgarian'),
+    ('CS', 'Czech'),
+    ('DA', 'Danish'),
+    ('ET', 'Estonian'),
+    ('FI', 'Finnish'),
+    ('EL', 'Greek'),
+    ('HU', 'Hungarian'),
+    ('LV', 'Latvian'),
+    ('LT', 'Lithuanian'),
+    ('RO', 'Romanian'),
+    ('SK', 'Slovak'),
+    ('SL', 'Slovenian'),
+    ('SV', 'Swedish'),
+)
+
 class DocumentUploadForm(forms.ModelForm):
     """Form for uploading documents."""
     class Meta:
@@ -14,92 +71,41 @@ class DocumentUploadForm(forms.ModelForm):
     def clean_file(self):
         file = self.cleaned_data.get('file')
         if file:
-            file_type = file.name.split('.')[-1].lower()
+            file_type = os.path.splitext(file.name)[1][1:].lower()
             if file_type not in ['pdf', 'png', 'jpg', 'jpeg', 'tiff', 'bmp', 'gif']:
                 raise forms.ValidationError("Unsupported file type. Please upload PDF, PNG, JPEG, TIFF, BMP, or GIF files.")
             
             # Store the file type for later use
             self.instance.file_type = file_type
+            
+            # Hash the upload in chunks so duplicates can be detected
+            digest = hashlib.sha256()
+            for chunk in file.chunks(1 << 20):
+                digest.update(chunk)
+            self.instance.content_sha256 = digest.hexdigest()
         return file
 
 class OCRLanguageForm(forms.ModelForm):
     """Form for selecting OCR language."""
+    language = forms.ChoiceField(
+        choices=OCR_LANGUAGE_CHOICES,
+        widget=forms.Select(attrs={'class': 'form-control'})
+    )
+    
     class Meta:
         model = OCRResult
         fields = ['language']
-        widgets = {
-            'language': forms.Select(attrs={'class': 'form-control'}),
-        }
-    
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        # List of common languages supported by Tesseract
-        language_choices = [
-            ('eng', 'English'),
-            ('fra', 'French'),
-            ('deu', 'German'),
-            ('spa', 'Spanish'),
-            ('ita', 'Italian'),
-            ('por', 'Portuguese'),
-            ('rus', 'Russian'),
-            ('jpn', 'Japanese'),
-            ('chi_sim', 'Chinese Simplified'),
-            ('chi_tra', 'Chinese Traditional'),
-            ('kor', 'Korean'),
-            ('ara', 'Arabic'),
-            ('hin', 'Hindi'),
-            ('vie', 'Vietnamese'),
-            ('nld', 'Dutch'),
-            ('swe', 'Swedish'),
-            ('fin', 'Finnish'),
-            ('pol', 'Polish'),
-            ('tur', 'Turkish'),
-            ('ell', 'Greek'),
-            ('heb', 'Hebrew'),
-        ]
-        self.fields['language'].choices = language_choices
 
 class TranslationForm(forms.ModelForm):
     """Form for selecting translation languages."""
+    target_language = forms.ChoiceField(
+        choices=DEEPL_LANGUAGE_CHOICES,
+        widget=forms.Select(attrs={'class': 'form-control'})
+    )
+    
     class Meta:
         model = Translation
         fields = ['target_language']
-        widgets = {
-            'target_language': forms.Select(attrs={'class': 'form-control'}),
-        }
-    
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        # List of languages supported by DeepL
-        language_choices = [
-            ('EN-US', 'English (American)'),
-            ('EN-GB', 'English (British)'),
-            ('FR', 'French'),
-            ('DE', 'German'),
-            ('ES', 'Spanish'),
-            ('IT', 'Italian'),
-            ('PT-PT', 'Portuguese'),
-            ('PT-BR', 'Portuguese (Brazilian)'),
-            ('RU', 'Russian'),
-            ('JA', 'Japanese'),
-            ('ZH', 'Chinese (simplified)'),
-            ('NL', 'Dutch'),
-            ('PL', 'Polish'),
-            ('BG', 'Bulgarian'),
-            ('CS', 'Czech'),
-            ('DA', 'Danish'),
-            ('ET', 'Estonian'),
-            ('FI', 'Finnish'),
-            ('EL', 'Greek'),
-            ('HU', 'Hungarian'),
-            ('LV', 'Latvian'),
-            ('LT', 'Lithuanian'),
-            ('RO', 'Romanian'),
-            ('SK', 'Slovak'),
-            ('SL', 'Slovenian'),
-            ('SV', 'Swedish'),
-        ]
-        self.fields['target_language'].choices = language_choices
 
 class OutputFormatForm(forms.Form):
     """Form for selecting output format and editing translated text."""
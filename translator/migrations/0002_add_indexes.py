@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-14 17:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('translator', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['status', '-uploaded_at'], name='translator__status_fab228_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['file_type'], name='translator__file_ty_6b9230_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ocrresult',
+            index=models.Index(fields=['language', '-created_at'], name='translator__languag_dd8f47_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='translation',
+            index=models.Index(fields=['target_language', '-created_at'], name='translator__target__60254e_idx'),
+        ),
+    ]
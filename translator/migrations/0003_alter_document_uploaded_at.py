@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-14 17:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('translator', '0002_add_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='document',
+            name='uploaded_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-14 17:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('translator', '0003_alter_document_uploaded_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outputfile',
+            name='content_etag',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-14 18:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('translator', '0004_outputfile_content_etag'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='content_sha256',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+    ]
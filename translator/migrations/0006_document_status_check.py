@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-14 18:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('translator', '0005_document_content_sha256'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='document',
+            constraint=models.CheckConstraint(condition=models.Q(('status__in', ['pending', 'processing', 'completed', 'failed'])), name='document_status_valid'),
+        ),
+    ]
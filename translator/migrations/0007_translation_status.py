@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-14 18:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('translator', '0006_document_status_check'),
+    ]
+
+    operations = [
+        # Translations stored before this migration were all finished
+        migrations.AddField(
+            model_name='translation',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('completed', 'Completed'), ('failed', 'Failed')], default='completed', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='translation',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='translation',
+            name='text',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddConstraint(
+            model_name='translation',
+            constraint=models.CheckConstraint(condition=models.Q(('status__in', ['pending', 'completed', 'failed'])), name='translation_status_valid'),
+        ),
+    ]
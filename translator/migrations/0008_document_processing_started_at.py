@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-14 18:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('translator', '0007_translation_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='processing_started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
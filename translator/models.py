@@ -1,41 +1,80 @@
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
+import datetime
 import os
+import secrets
+import time
 import uuid
 
 def get_file_path(instance, filename):
     """Generate a unique file path for uploaded files."""
-    ext = filename.split('.')[-1]
+    ext = instance.file_type or os.path.splitext(filename)[1][1:].lower()
     filename = f"{uuid.uuid4()}.{ext}"
     return os.path.join('uploads', filename)
 
+def ordered_filename(ext):
+    """Generate a unique file name that sorts by creation time."""
+    return f"{time.time_ns():016x}-{secrets.token_hex(4)}.{ext}"
+
 def get_output_path(instance, filename):
     """Generate a unique file path for output files."""
-    ext = filename.split('.')[-1]
-    filename = f"{uuid.uuid4()}.{ext}"
-    return os.path.join('outputs', filename)
+    ext = instance.file_type or os.path.splitext(filename)[1][1:].lower()
+    return os.path.join('outputs', ordered_filename(ext))
+
+# An OCR run is assumed dead once its claim is older than the task's time
+# limit plus a margin, e.g. after a lost task or a killed process
+OCR_CLAIM_TIMEOUT = datetime.timedelta(seconds=settings.OCR_TIME_LIMIT + 5 * 60)
+
+class DocumentStatus(models.TextChoices):
+    """Processing states of a document."""
+    PENDING = 'pending', 'Pending'
+    PROCESSING = 'processing', 'Processing'
+    COMPLETED = 'completed', 'Completed'
+    FAILED = 'failed', 'Failed'
 
 class Document(models.Model):
     """Model to store uploaded documents."""
-    PROCESSING_STATUS = (
-        ('pending', 'Pending'),
-        ('processing', 'Processing'),
-        ('completed', 'Completed'),
-        ('failed', 'Failed'),
-    )
+    Status = DocumentStatus
     
     title = models.CharField(max_length=255, blank=True)
     file = models.FileField(upload_to=get_file_path)
     file_type = models.CharField(max_length=10)
-    uploaded_at = models.DateTimeField(auto_now_add=True)
-    status = models.CharField(max_length=20, choices=PROCESSING_STATUS, default='pending')
+    uploaded_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    processing_started_at = models.DateTimeField(null=True, blank=True)
+    content_sha256 = models.CharField(max_length=64, blank=True, db_index=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', '-uploaded_at']),
+            models.Index(fields=['file_type']),
+        ]
+        constraints = [
+            # Reject unknown status values at the database level
+            models.CheckConstraint(
+                condition=models.Q(status__in=DocumentStatus.values),
+                name='document_status_valid',
+            ),
+        ]
     
     def __str__(self):
         return self.title or os.path.basename(self.file.name)
     
+    @property
+    def processing_stale(self):
+        """Whether the document is processing under a claim that has expired."""
+        return self.status == DocumentStatus.PROCESSING and (
+            self.processing_started_at is None
+            or self.processing_started_at < timezone.now() - OCR_CLAIM_TIMEOUT
+        )
+    
     def delete(self, *args, **kwargs):
-        # Delete the file when the model instance is deleted
+        # Delete the file when the model instance is deleted, unless another
+        # document of the same upload still uses it
         if self.file:
-            if os.path.isfile(self.file.path):
+            shared = Document.objects.filter(file=self.file.name).exclude(pk=self.pk).exists()
+            if not shared and os.path.isfile(self.file.path):
                 os.remove(self.file.path)
         super().delete(*args, **kwargs)
 
@@ -46,17 +85,43 @@ class OCRResult(models.Model):
     language = models.CharField(max_length=10, default='eng')
     created_at = models.DateTimeField(auto_now_add=True)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['language', '-created_at']),
+        ]
+    
     def __str__(self):
         return f"OCR Result for {self.document}"
 
+class TranslationStatus(models.TextChoices):
+    """Processing states of a translation."""
+    PENDING = 'pending', 'Pending'
+    COMPLETED = 'completed', 'Completed'
+    FAILED = 'failed', 'Failed'
+
 class Translation(models.Model):
     """Model to store translations."""
+    Status = TranslationStatus
+    
     ocr_result = models.ForeignKey(OCRResult, on_delete=models.CASCADE, related_name='translations')
-    text = models.TextField()
+    text = models.TextField(blank=True)
     source_language = models.CharField(max_length=10)
     target_language = models.CharField(max_length=10)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
     created_at = models.DateTimeField(auto_now_add=True)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['target_language', '-created_at']),
+        ]
+        constraints = [
+            # Reject unknown status values at the database level
+            models.CheckConstraint(
+                condition=models.Q(status__in=TranslationStatus.values),
+                name='translation_status_valid',
+            ),
+        ]
+    
     def __str__(self):
         return f"Translation from {self.source_language} to {self.target_language}"
 
@@ -73,6 +138,7 @@ class OutputFile(models.Model):
     translation = models.ForeignKey(Translation, on_delete=models.CASCADE, related_name='output_files')
     file = models.FileField(upload_to=get_output_path)
     file_type = models.CharField(max_length=10, choices=OUTPUT_TYPES)
+    content_etag = models.CharField(max_length=64, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
     def __str__(self):
@@ -0,0 +1,129 @@
+import hashlib
+import logging
+
+from celery import shared_task
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Document, OCRResult, Translation
+from .utils import TESSERACT_TO_DEEPL, perform_ocr, translate_text
+
+logger = logging.getLogger(__name__)
+
+# How long a DeepL translation is reused for identical text (one week)
+TRANSLATION_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+
+@shared_task(
+    acks_late=True,
+    reject_on_worker_lost=True,
+    soft_time_limit=settings.OCR_TIME_LIMIT,
+    time_limit=settings.OCR_TIME_LIMIT + 60
+)
+def run_ocr(document_id, language):
+    """
+    Perform OCR on a document and store the result.
+    
+    The document status is set to completed or failed when the task ends.
+    The task is acknowledged only once it finishes, so it is delivered
+    again if the worker dies while running it. Hitting the soft time limit
+    raises inside the task, which marks the document failed.
+    
+    Args:
+        document_id (int): ID of the document
+        language (str): Language code for OCR
+        
+    Returns:
+        int: ID of the created OCR result
+    """
+    document = Document.objects.select_related('ocr_result').get(id=document_id)
+    
+    # A redelivered task may find the result already stored
+    if hasattr(document, 'ocr_result'):
+        return document.ocr_result.id
+    
+    try:
+        # Perform OCR
+        ocr_text = perform_ocr(document.file.path, language, file_ext=document.file_type)
+        
+        # Create OCR result and update document status in one commit
+        with transaction.atomic():
+            ocr_result = OCRResult.objects.create(
+                document=document,
+                text=ocr_text,
+                language=language
+            )
+            document.status = Document.Status.COMPLETED
+            document.save(update_fields=['status'])
+    except Exception:
+        # Leave the status alone if another run already stored a result
+        Document.objects.filter(
+            pk=document.pk,
+            ocr_result__isnull=True
+        ).update(status=Document.Status.FAILED)
+        raise
+    
+    return ocr_result.id
+
+@shared_task(acks_late=True, reject_on_worker_lost=True)
+def run_translate(translation_id):
+    """
+    Translate the OCR text of a pending translation and store the result.
+    
+    The translation status is set to completed or failed when the task ends.
+    
+    Args:
+        translation_id (int): ID of the pending translation
+        
+    Returns:
+        int: ID of the translation
+    """
+    translation = Translation.objects.select_related('ocr_result').get(id=translation_id)
+    
+    # A redelivered task may find the translation already finished
+    if translation.status != Translation.Status.PENDING:
+        return translation.id
+    
+    ocr_result = translation.ocr_result
+    target_lang = translation.target_language
+    
+    # Get source language from OCR result
+    deepl_source_lang = TESSERACT_TO_DEEPL.get(ocr_result.language)
+    
+    # Reuse an earlier translation of the same text and language pair.
+    # The cache is only an optimisation, so its errors never fail the task.
+    cache_key = 'tr:' + hashlib.blake2b(
+        f'{deepl_source_lang}|{target_lang}|{ocr_result.text}'.encode('utf-8'),
+        digest_size=16
+    ).hexdigest()
+    try:
+        translated_text = cache.get(cache_key)
+    except Exception:
+        logger.warning('Translation cache lookup failed', exc_info=True)
+        translated_text = None
+    
+    if translated_text is None:
+        try:
+            # Translate text
+            translated_text = translate_text(
+                ocr_result.text,
+                source_lang=deepl_source_lang,
+                target_lang=target_lang
+            )
+        except Exception:
+            logger.exception('Translation %s failed', translation.id)
+            translation.status = Translation.Status.FAILED
+            translation.save(update_fields=['status'])
+            raise
+        
+        try:
+            cache.set(cache_key, translated_text, TRANSLATION_CACHE_TIMEOUT)
+        except Exception:
+            logger.warning('Translation cache store failed', exc_info=True)
+    
+    # Store the translation
+    translation.text = translated_text
+    translation.status = Translation.Status.COMPLETED
+    translation.save(update_fields=['text', 'status'])
+    
+    return translation.id
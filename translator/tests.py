@@ -1,3 +1,261 @@
-from django.test import TestCase
+import datetime
+import os
+import shutil
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Document, OCRResult, Translation, OutputFile, OCR_CLAIM_TIMEOUT
+from .tasks import run_ocr, run_translate
+from .utils import _split_into_chunks, _iter_pages, _ocr_page_batch, _wrap_to_width, file_etag
+from .views import _url_template
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+class UtilsTests(SimpleTestCase):
+    """Tests for the pure text helpers."""
+
+    def test_split_into_chunks_rejoins_to_original(self):
+        text = '\n\n'.join(f'Paragraph {i} ' + 'x' * (i * 37 % 500) for i in range(300))
+        chunks = _split_into_chunks(text, max_bytes=2000)
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual('\n\n'.join(chunks), text)
+
+    def test_split_into_chunks_counts_escaped_size(self):
+        # Each Japanese character is sent as a six-byte JSON escape
+        text = '\n\n'.join(['日本語' * 100] * 10)
+        chunks = _split_into_chunks(text, max_bytes=2000)
+        self.assertEqual(len(chunks), 10)
+        self.assertEqual('\n\n'.join(chunks), text)
+
+    def test_iter_pages_splits_at_markers(self):
+        text = "\n\n--- Page 1 ---\n\nfirst page\n\n--- Page 2 ---\n\nsecond\npage"
+        self.assertEqual(list(_iter_pages(text)), ['', 'first page', 'second\npage'])
+
+    def test_iter_pages_without_markers(self):
+        self.assertEqual(list(_iter_pages('plain text\n')), ['plain text'])
+
+    def test_ocr_page_batch_rejects_missing_pages(self):
+        work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, work_dir)
+
+        def fake_tesseract(args, **kwargs):
+            # Write only two of the three pages
+            with open(f'{args[2]}.txt', 'w', encoding='utf-8') as f:
+                f.write('one\n\ftwo\n\f')
+            return mock.Mock(returncode=0)
+
+        with mock.patch('translator.utils.subprocess.run', side_effect=fake_tesseract):
+            with self.assertRaises(RuntimeError):
+                _ocr_page_batch(['a.jpg', 'b.jpg', 'c.jpg'], 0, work_dir)
+            self.assertEqual(_ocr_page_batch(['a.jpg', 'b.jpg'], 1, work_dir), ['one\n', 'two\n'])
+
+    def test_wrap_to_width_fits_wide_glyphs(self):
+        # CJK glyphs are twice as wide as Latin ones in this fake font
+        font = mock.Mock()
+        font.getlength.side_effect = lambda text: sum(
+            20 if ord(char) > 0x2e80 else 10 for char in text
+        )
+        line = 'latin text ' * 20 + '日本語のテキスト' * 20
+        pieces = _wrap_to_width(line, font, 400)
+        self.assertTrue(all(font.getlength(piece) <= 400 for piece in pieces))
+        self.assertEqual(''.join(pieces).replace(' ', ''), line.replace(' ', ''))
+
+class UrlTemplateTests(SimpleTestCase):
+    """Tests for the cached URL templates."""
+
+    def test_url_template_matches_reverse(self):
+        for view_name in ('translator:ocr', 'translator:document_detail', 'translator:download'):
+            url = _url_template(view_name, '/').format(42)
+            self.assertEqual(url, reverse(view_name, args=[42]))
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class TranslatorTestCase(TestCase):
+    """Base class creating documents under a temporary MEDIA_ROOT."""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def create_document(self, content=b'image', **kwargs):
+        return Document.objects.create(
+            file=SimpleUploadedFile('page.png', content),
+            file_type='png',
+            **kwargs
+        )
+
+class OCRTaskTests(TranslatorTestCase):
+    """Tests for the OCR task and view."""
+
+    def test_run_ocr_completes(self):
+        document = self.create_document(status=Document.Status.PROCESSING)
+        with mock.patch('translator.tasks.perform_ocr', return_value='text'):
+            ocr_id = run_ocr(document.id, 'eng')
+        document.refresh_from_db()
+        self.assertEqual(document.status, Document.Status.COMPLETED)
+        self.assertEqual(OCRResult.objects.get(id=ocr_id).text, 'text')
+
+    def test_run_ocr_fails(self):
+        document = self.create_document(status=Document.Status.PROCESSING)
+        with mock.patch('translator.tasks.perform_ocr', side_effect=RuntimeError('bad image')):
+            with self.assertRaises(RuntimeError):
+                run_ocr(document.id, 'eng')
+        document.refresh_from_db()
+        self.assertEqual(document.status, Document.Status.FAILED)
+        self.assertFalse(OCRResult.objects.exists())
+
+    def test_ocr_view_releases_document_when_queueing_fails(self):
+        document = self.create_document()
+        with mock.patch('translator.views.run_ocr.delay', side_effect=OSError('broker down')):
+            with self.assertLogs('translator.views', 'ERROR'):
+                response = self.client.post(reverse('translator:ocr', args=[document.id]), {'language': 'eng'})
+        self.assertEqual(response.status_code, 302)
+        document.refresh_from_db()
+        self.assertEqual(document.status, Document.Status.FAILED)
+
+    def test_ocr_view_does_not_queue_twice(self):
+        document = self.create_document(
+            status=Document.Status.PROCESSING,
+            processing_started_at=timezone.now()
+        )
+        with mock.patch('translator.views.run_ocr.delay') as delay:
+            self.client.post(reverse('translator:ocr', args=[document.id]), {'language': 'eng'})
+        delay.assert_not_called()
+
+    def test_ocr_view_takes_over_stale_claim(self):
+        started_at = timezone.now() - OCR_CLAIM_TIMEOUT - datetime.timedelta(minutes=1)
+        document = self.create_document(
+            status=Document.Status.PROCESSING,
+            processing_started_at=started_at
+        )
+        response = self.client.get(reverse('translator:document_detail', args=[document.id]))
+        self.assertContains(response, 'Start OCR Processing')
+        self.assertNotContains(response, 'http-equiv="refresh"')
+
+        with mock.patch('translator.views.run_ocr.delay') as delay:
+            self.client.post(reverse('translator:ocr', args=[document.id]), {'language': 'eng'})
+        delay.assert_called_once_with(document.id, 'eng')
+        document.refresh_from_db()
+        self.assertEqual(document.status, Document.Status.PROCESSING)
+        self.assertGreater(document.processing_started_at, started_at)
+
+class TranslationTaskTests(TranslatorTestCase):
+    """Tests for the translation task and view."""
+
+    def setUp(self):
+        super().setUp()
+        document = self.create_document(status=Document.Status.COMPLETED)
+        self.ocr_result = OCRResult.objects.create(document=document, text='Hallo', language='deu')
+
+    def translate(self):
+        return self.client.post(
+            reverse('translator:translate', args=[self.ocr_result.id]),
+            {'target_language': 'EN-US'},
+            follow=True
+        )
+
+    def test_run_translate_completes(self):
+        with mock.patch('translator.tasks.translate_text', return_value='Hello'):
+            self.translate()
+        translation = Translation.objects.get()
+        self.assertEqual(translation.status, Translation.Status.COMPLETED)
+        self.assertEqual(translation.text, 'Hello')
+
+    def test_run_translate_failure_is_recorded_and_shown(self):
+        with mock.patch('translator.tasks.translate_text', side_effect=RuntimeError('quota')):
+            with self.assertLogs('translator.tasks', 'ERROR'):
+                response = self.translate()
+        self.assertEqual(Translation.objects.get().status, Translation.Status.FAILED)
+        self.assertContains(response, 'Translation failed.')
+
+    def test_cache_errors_do_not_fail_translation(self):
+        broken_cache = mock.Mock()
+        broken_cache.get.side_effect = ConnectionError('cache down')
+        broken_cache.set.side_effect = ConnectionError('cache down')
+        with mock.patch('translator.tasks.cache', broken_cache), \
+                mock.patch('translator.tasks.translate_text', return_value='Hello'):
+            with self.assertLogs('translator.tasks', 'WARNING'):
+                self.translate()
+        translation = Translation.objects.get()
+        self.assertEqual(translation.status, Translation.Status.COMPLETED)
+        self.assertEqual(translation.text, 'Hello')
+
+    def test_pending_translation_refreshes_page(self):
+        with mock.patch('translator.views.run_translate.delay'):
+            response = self.translate()
+        self.assertEqual(Translation.objects.get().status, Translation.Status.PENDING)
+        self.assertContains(response, 'http-equiv="refresh"')
+
+    def test_redelivered_task_keeps_finished_translation(self):
+        translation = Translation.objects.create(
+            ocr_result=self.ocr_result,
+            text='Hello',
+            source_language='deu',
+            target_language='EN-US',
+            status=Translation.Status.COMPLETED
+        )
+        with mock.patch('translator.tasks.translate_text') as translate_text:
+            run_translate(translation.id)
+        translate_text.assert_not_called()
+
+class UploadTests(TranslatorTestCase):
+    """Tests for duplicate upload handling."""
+
+    def test_duplicate_upload_reuses_stored_file(self):
+        for title in ('First', 'Second'):
+            self.client.post(reverse('translator:upload'), {
+                'title': title,
+                'file': SimpleUploadedFile('scan.png', b'same bytes'),
+            })
+        first, second = Document.objects.order_by('id')
+        self.assertEqual(second.title, 'Second')
+        self.assertEqual(first.file.name, second.file.name)
+
+        # The shared file stays until its last document is deleted
+        first.delete()
+        self.assertTrue(os.path.isfile(second.file.path))
+        second.delete()
+        self.assertFalse(os.path.isfile(second.file.path))
+
+class DownloadTests(TranslatorTestCase):
+    """Tests for output file downloads."""
+
+    def setUp(self):
+        super().setUp()
+        document = self.create_document(status=Document.Status.COMPLETED)
+        ocr_result = OCRResult.objects.create(document=document, text='Hallo', language='deu')
+        translation = Translation.objects.create(
+            ocr_result=ocr_result,
+            text='Hello',
+            source_language='deu',
+            target_language='EN-US',
+            status=Translation.Status.COMPLETED
+        )
+        self.output_file = OutputFile(translation=translation, file_type='txt')
+        self.output_file.file.save('output.txt', ContentFile(b'Hello'), save=False)
+        self.output_file.content_etag = file_etag(self.output_file.file.path)
+        self.output_file.save()
+        self.url = reverse('translator:download', args=[self.output_file.id])
+
+    def test_download_returns_file(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'Hello')
+        response.close()
+
+    def test_conditional_get_returns_not_modified(self):
+        first = self.client.get(self.url)
+        etag = first['ETag']
+        first.close()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
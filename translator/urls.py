@@ -10,6 +10,7 @@ urlpatterns = [
     path('translate/<int:ocr_id>/', views.translate_view, name='translate'),
     path('output-format/<int:translation_id>/', views.output_format_view, name='output_format'),
     path('result/<int:output_id>/', views.result_view, name='result'),
+    path('result/<int:output_id>/download/', views.download_view, name='download'),
     path('document/<int:document_id>/', views.document_detail_view, name='document_detail'),
     path('document/<int:document_id>/delete/', views.delete_document_view, name='delete_document'),
 ]
\ No newline at end of file
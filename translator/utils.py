@@ -1,4 +1,12 @@
 import os
+import re
+import functools
+import hashlib
+import json
+import subprocess
+import textwrap
+import types
+from concurrent.futures import ThreadPoolExecutor
 import pytesseract
 from PIL import Image
 import deepl
@@ -10,28 +18,51 @@ from django.conf import settings
 from io import BytesIO
 import tempfile
 
-def perform_ocr(file_path, language='eng'):
+# Set Tesseract command path from settings once, rather than rewriting the
+# module global on every call
+pytesseract.pytesseract.tesseract_cmd = settings.TESSERACT_CMD
+
+# Map Tesseract language codes to DeepL language codes
+TESSERACT_TO_DEEPL = types.MappingProxyType({
+    'eng': 'EN',
+    'fra': 'FR',
+    'deu': 'DE',
+    'spa': 'ES',
+    'ita': 'IT',
+    'por': 'PT',
+    'rus': 'RU',
+    'jpn': 'JA',
+    'chi_sim': 'ZH',
+    'nld': 'NL',
+    'pol': 'PL',
+})
+
+# Resolution for rendering PDF pages; Tesseract gains little above this
+# for body text, and it only needs a single grayscale channel
+OCR_PDF_DPI = 150
+
+def perform_ocr(file_path, language='eng', file_ext=None):
     """
     Perform OCR on the given file.
     
     Args:
         file_path (str): Path to the file
         language (str): Language code for OCR
+        file_ext (str, optional): Lower-case extension without the dot,
+            derived from file_path if not given
         
     Returns:
         str: Extracted text
     """
-    # Set Tesseract command path from settings
-    pytesseract.pytesseract.tesseract_cmd = settings.TESSERACT_CMD
-    
-    file_ext = os.path.splitext(file_path)[1].lower()
+    if not file_ext:
+        file_ext = os.path.splitext(file_path)[1][1:].lower()
     
     # For PDF files, convert to images first
-    if file_ext == '.pdf':
+    if file_ext == 'pdf':
         return ocr_pdf(file_path, language)
     
     # For image files
-    elif file_ext in ['.png', '.jpg', '.jpeg', '.tiff', '.bmp', '.gif']:
+    elif file_ext in ['png', 'jpg', 'jpeg', 'tiff', 'bmp', 'gif']:
         return ocr_image(file_path, language)
     
     else:
@@ -55,6 +86,55 @@ def ocr_image(image_path, language='eng'):
     except Exception as e:
         raise Exception(f"Error performing OCR on image: {str(e)}")
 
+def _ocr_page_batch(image_paths, batch_id, work_dir, language='eng'):
+    """
+    Perform OCR on a batch of page images with a single tesseract process.
+    
+    Tesseract accepts a text file listing several images and processes them
+    all with one model load, separating the pages with a form feed.
+    
+    Args:
+        image_paths (list): Paths to the page images, in page order
+        batch_id (int): Index used to keep batch file names apart
+        work_dir (str): Directory for the list and output files
+        language (str): Language code for OCR
+        
+    Returns:
+        list: Extracted text for each page
+    """
+    list_path = os.path.join(work_dir, f'list{batch_id}.txt')
+    output_base = os.path.join(work_dir, f'out{batch_id}')
+    
+    with open(list_path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(image_paths) + '\n')
+    
+    result = subprocess.run(
+        [
+            pytesseract.pytesseract.tesseract_cmd,
+            list_path, output_base,
+            '-l', language,
+            '--psm', '3'
+        ],
+        capture_output=True,
+        # Pages are already spread over one process per core, so stop each
+        # process from starting its own OpenMP threads as well
+        env={**os.environ, 'OMP_THREAD_LIMIT': '1'}
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.decode('utf-8', errors='replace').strip())
+    
+    with open(f'{output_base}.txt', encoding='utf-8') as f:
+        output = f.read()
+    
+    # Every page is followed by the page separator. A missing page would
+    # shift the text of every later page onto the wrong page number.
+    pages = output.split('\f')[:-1]
+    if len(pages) != len(image_paths):
+        raise RuntimeError(
+            f"Tesseract returned {len(pages)} pages for {len(image_paths)} images"
+        )
+    return pages
+
 def ocr_pdf(pdf_path, language='eng'):
     """
     Perform OCR on a PDF file by converting it to images.
@@ -67,46 +147,161 @@ def ocr_pdf(pdf_path, language='eng'):
         str: Extracted text
     """
     try:
-        # Convert PDF to images
-        images = convert_from_path(pdf_path)
-        
-        # Perform OCR on each image
-        text = ""
-        for i, img in enumerate(images):
-            page_text = pytesseract.image_to_string(img, lang=language)
-            text += f"\n\n--- Page {i+1} ---\n\n{page_text}"
-        
-        return text
+        workers = os.cpu_count() or 1
+        
+        with tempfile.TemporaryDirectory() as work_dir:
+            # Convert PDF to images (Poppler rasterizes pages in parallel and
+            # writes them straight to disk for tesseract to read)
+            image_paths = convert_from_path(
+                pdf_path,
+                dpi=OCR_PDF_DPI,
+                output_folder=work_dir,
+                paths_only=True,
+                thread_count=workers,
+                fmt='jpeg',
+                grayscale=True
+            )
+            
+            # Split the pages into one contiguous batch per worker so each
+            # tesseract process loads the language model only once.
+            # Tesseract runs out-of-process, so threads are enough here.
+            batch_size = max(1, -(-len(image_paths) // workers))
+            batches = [
+                image_paths[i:i + batch_size]
+                for i in range(0, len(image_paths), batch_size)
+            ]
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                batch_texts = list(executor.map(
+                    functools.partial(_ocr_page_batch, language=language, work_dir=work_dir),
+                    batches,
+                    range(len(batches))
+                ))
+        
+        page_texts = [text for batch in batch_texts for text in batch]
+        return "".join(
+            f"\n\n--- Page {i+1} ---\n\n{page_text}"
+            for i, page_text in enumerate(page_texts)
+        )
     except Exception as e:
         raise Exception(f"Error performing OCR on PDF: {str(e)}")
 
+# DeepL limits the size of a single request body to 128 KiB, so long
+# documents are split into paragraph chunks and sent a few at a time.
+# Chunk sizes are measured as sent: the SDK posts JSON with every
+# non-ASCII character escaped to six or more bytes.
+DEEPL_MAX_CHUNK_BYTES = 30 * 1024
+DEEPL_CHUNKS_PER_REQUEST = 4
+DEEPL_MAX_CONCURRENT_REQUESTS = 4
+
+@functools.lru_cache(maxsize=1)
+def _get_translator():
+    """
+    Return a shared DeepL translator so its HTTP session is reused.
+    
+    Returns:
+        deepl.Translator: DeepL translator
+    """
+    return deepl.Translator(settings.DEEPL_API_KEY)
+
+def _split_into_chunks(text, max_bytes=DEEPL_MAX_CHUNK_BYTES):
+    """
+    Split text on paragraph boundaries into chunks of at most max_bytes.
+    
+    A single paragraph longer than max_bytes is kept as its own chunk.
+    
+    Args:
+        text (str): Text to split
+        max_bytes (int): Maximum size of a chunk once encoded as a JSON string
+        
+    Returns:
+        list: Text chunks, which rejoin to the original text with "\n\n"
+    """
+    chunks = []
+    current = []
+    current_size = 0
+    
+    for paragraph in text.split('\n\n'):
+        # JSON-escaped length without the quotes, plus the escaped "\n\n"
+        paragraph_size = len(json.dumps(paragraph)) - 2 + 4
+        if current and current_size + paragraph_size > max_bytes:
+            chunks.append('\n\n'.join(current))
+            current = []
+            current_size = 0
+        current.append(paragraph)
+        current_size += paragraph_size
+    
+    chunks.append('\n\n'.join(current))
+    return chunks
+
 def translate_text(text, source_lang=None, target_lang='EN-US'):
     """
     Translate text using DeepL API.
     
     Args:
-        text (str): Text to translate
+        text (str or list): Text to translate, or a list of texts
         source_lang (str, optional): Source language code
         target_lang (str): Target language code
         
     Returns:
-        str: Translated text
+        str or list: Translated text, or a list of translated texts
     """
     try:
-        # Initialize DeepL translator
-        translator = deepl.Translator(settings.DEEPL_API_KEY)
-        
-        # Translate text
-        result = translator.translate_text(
-            text,
-            source_lang=source_lang,
-            target_lang=target_lang
+        translator = _get_translator()
+        
+        # A list is already split by the caller; translate it as one batch
+        if isinstance(text, list):
+            results = translator.translate_text(
+                text,
+                source_lang=source_lang,
+                target_lang=target_lang
+            )
+            return [result.text for result in results]
+        
+        # Translate long text in paragraph chunks, several per request, and
+        # send the requests concurrently to overlap their round-trips
+        chunks = _split_into_chunks(text)
+        batches = [
+            chunks[i:i + DEEPL_CHUNKS_PER_REQUEST]
+            for i in range(0, len(chunks), DEEPL_CHUNKS_PER_REQUEST)
+        ]
+        with ThreadPoolExecutor(max_workers=DEEPL_MAX_CONCURRENT_REQUESTS) as executor:
+            batch_results = list(executor.map(
+                functools.partial(
+                    translator.translate_text,
+                    source_lang=source_lang,
+                    target_lang=target_lang
+                ),
+                batches
+            ))
+        
+        return '\n\n'.join(
+            result.text for results in batch_results for result in results
         )
-        
-        return result.text
     except Exception as e:
         raise Exception(f"Error translating text: {str(e)}")
 
+# Page markers inserted between pages by ocr_pdf
+_PAGE_RE = re.compile(r'\n*--- Page \d+ ---\n*')
+
+def _iter_pages(text):
+    """
+    Split page-delimited text into the content of each page.
+    
+    The first item is the text before the first page marker, which is
+    empty for OCR output.
+    
+    Args:
+        text (str): Text containing "--- Page N ---" markers
+        
+    Yields:
+        str: Stripped content of each page
+    """
+    pos = 0
+    for match in _PAGE_RE.finditer(text):
+        yield text[pos:match.start()].strip()
+        pos = match.end()
+    yield text[pos:].strip()
+
 def create_text_file(text, output_path):
     """
     Create a text file with the given text.
@@ -150,23 +345,16 @@ def create_docx_file(text, output_path):
         font.size = Pt(11)
         
         # Split text by page markers
-        pages = text.split("--- Page")
+        pages = _iter_pages(text)
         
         # Add first part (if any)
-        if pages[0].strip():
-            paragraph = doc.add_paragraph(pages[0].strip())
+        first = next(pages)
+        if first:
+            paragraph = doc.add_paragraph(first)
             paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.LEFT
         
         # Add remaining pages with page breaks
-        for page in pages[1:]:
-            # Extract page number and content
-            parts = page.split("---", 1)
-            if len(parts) > 1:
-                content = parts[1].strip()
-            else:
-                content = parts[0].strip()
-            
-            # Add page break and content
+        for content in pages:
             doc.add_page_break()
             paragraph = doc.add_paragraph(content)
             paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.LEFT
@@ -181,22 +369,15 @@ def create_docx_file(text, output_path):
             doc = Document()
             
             # Split text by page markers
-            pages = text.split("--- Page")
+            pages = _iter_pages(text)
             
             # Add first part (if any)
-            if pages[0].strip():
-                doc.add_paragraph(pages[0].strip())
+            first = next(pages)
+            if first:
+                doc.add_paragraph(first)
             
             # Add remaining pages with page breaks
-            for page in pages[1:]:
-                # Extract page number and content
-                parts = page.split("---", 1)
-                if len(parts) > 1:
-                    content = parts[1].strip()
-                else:
-                    content = parts[0].strip()
-                
-                # Add page break and content
+            for content in pages:
                 doc.add_page_break()
                 doc.add_paragraph(content)
             
@@ -206,6 +387,71 @@ def create_docx_file(text, output_path):
         except Exception as nested_e:
             raise Exception(f"Error creating Word document: {str(e)} -> {str(nested_e)}")
 
+# Fonts that support Japanese, in order of preference
+_POTENTIAL_FONTS = [
+    ('Arial Unicode MS', 'arialuni.ttf'),
+    ('MS Gothic', 'msgothic.ttc'),
+    ('Yu Gothic', 'yugothic.ttf'),
+    ('Meiryo', 'meiryo.ttc'),
+    ('Noto Sans CJK JP', 'NotoSansCJKjp-Regular.otf')
+]
+
+# Common font locations on Windows, Linux and macOS
+_FONT_DIRS = [
+    'C:/Windows/Fonts/',
+    os.path.expanduser('~/.fonts/'),
+    os.path.expanduser('~/Library/Fonts/')
+]
+
+@functools.lru_cache(maxsize=1)
+def _find_cjk_font():
+    """
+    Find an installed font that supports Japanese, scanning once per process.
+    
+    Returns:
+        tuple or None: (font name, font path), or None if none is installed
+    """
+    for font_name, font_file in _POTENTIAL_FONTS:
+        for font_dir in _FONT_DIRS:
+            font_path = os.path.join(font_dir, font_file)
+            if os.path.exists(font_path):
+                return font_name, font_path
+    return None
+
+@functools.lru_cache(maxsize=None)
+def _load_image_font(font_path, size):
+    """
+    Load a TrueType font for Pillow once per path and size.
+    
+    Args:
+        font_path (str): Path to the font file
+        size (int): Font size in pixels
+        
+    Returns:
+        PIL.ImageFont.FreeTypeFont: Loaded font
+    """
+    from PIL import ImageFont
+    
+    return ImageFont.truetype(font_path, size)
+
+@functools.lru_cache(maxsize=None)
+def _register_reportlab_font(font_name, font_path):
+    """
+    Register a TrueType font with ReportLab once per process.
+    
+    Args:
+        font_name (str): Name to register the font under
+        font_path (str): Path to the font file
+        
+    Returns:
+        str: Registered font name
+    """
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+    
+    pdfmetrics.registerFont(TTFont(font_name, font_path))
+    return font_name
+
 def create_pdf_file(text, output_path):
     """
     Create a PDF file with the given text.
@@ -245,36 +491,14 @@ def create_pdf_file(text, output_path):
                     # Fall back to the default font with limited Unicode support
                     pdf.set_font('Arial', '', 10)
         
-        # Split text by page markers
-        pages = text.split("--- Page")
-        
         # Process each page
-        for i, page_content in enumerate(pages):
+        for i, content in enumerate(_iter_pages(text)):
             if i > 0:  # Not the first item
                 pdf.add_page()  # Start a new page
             
-            # Clean up the page content
-            if i == 0:  # First part
-                content = page_content.strip()
-            else:
-                # Extract content after the page number
-                parts = page_content.split("---", 1)
-                if len(parts) > 1:
-                    content = parts[1].strip()
-                else:
-                    content = parts[0].strip()
-            
-            # Split content into lines and write to PDF
-            lines = content.split('\n')
-            for line in lines:
-                # Handle empty lines
-                if not line.strip():
-                    pdf.ln(5)  # Add some space
-                    continue
-                
-                # Write the line with multi-cell to handle wrapping
-                pdf.multi_cell(0, 5, line)
-                pdf.ln(2)  # Add a small space between lines
+            # Write the whole page at once; multi_cell handles newlines
+            # and wrapping itself
+            pdf.multi_cell(0, 5, content)
         
         # Save the PDF
         pdf.output(output_path)
@@ -283,97 +507,51 @@ def create_pdf_file(text, output_path):
         # Try alternative method if the first one fails
         try:
             # Use ReportLab with a Unicode font
-            from reportlab.pdfgen import canvas
             from reportlab.lib.pagesizes import letter
-            from reportlab.pdfbase import pdfmetrics
-            from reportlab.pdfbase.ttfonts import TTFont
+            from reportlab.lib.styles import ParagraphStyle
+            from reportlab.platypus import SimpleDocTemplate, Paragraph, PageBreak
+            from xml.sax.saxutils import escape
             import tempfile
             import os
             
             # Try to register a font that supports Japanese
             font_registered = False
-            
-            # List of potential fonts that support Japanese
-            potential_fonts = [
-                ('Arial Unicode MS', 'arialuni.ttf'),
-                ('MS Gothic', 'msgothic.ttc'),
-                ('Yu Gothic', 'yugothic.ttf'),
-                ('Meiryo', 'meiryo.ttc'),
-                ('Noto Sans CJK JP', 'NotoSansCJKjp-Regular.otf')
-            ]
-            
-            # Common font locations on Windows
-            font_dirs = [
-                'C:/Windows/Fonts/',
-                os.path.expanduser('~/.fonts/'),
-                os.path.expanduser('~/Library/Fonts/')
-            ]
-            
-            # Try to find and register a suitable font
-            for font_name, font_file in potential_fonts:
-                for font_dir in font_dirs:
-                    font_path = os.path.join(font_dir, font_file)
-                    if os.path.exists(font_path):
-                        try:
-                            pdfmetrics.registerFont(TTFont(font_name, font_path))
-                            font_registered = True
-                            break
-                        except:
-                            continue
-                if font_registered:
-                    break
-            
-            # Create a PDF document
-            c = canvas.Canvas(output_path, pagesize=letter)
-            width, height = letter
+            cjk_font = _find_cjk_font()
+            if cjk_font:
+                font_name, font_path = cjk_font
+                try:
+                    _register_reportlab_font(font_name, font_path)
+                    font_registered = True
+                except:
+                    pass
             
             # Set font - use registered font or default
-            if font_registered:
-                c.setFont(font_name, 10)
-            else:
-                c.setFont('Helvetica', 10)
+            style = ParagraphStyle(
+                'Body',
+                fontName=font_name if font_registered else 'Helvetica',
+                fontSize=10,
+                leading=14
+            )
             
-            # Split text by page markers
-            pages = text.split("--- Page")
+            # Let ReportLab lay out and paginate the text
+            doc = SimpleDocTemplate(
+                output_path,
+                pagesize=letter,
+                leftMargin=40,
+                rightMargin=40,
+                topMargin=40,
+                bottomMargin=40
+            )
+            story = []
             
             # Process each page
-            for i, page_content in enumerate(pages):
+            for i, content in enumerate(_iter_pages(text)):
                 if i > 0:  # Not the first item
-                    c.showPage()  # Start a new page
-                    if font_registered:
-                        c.setFont(font_name, 10)
-                    else:
-                        c.setFont('Helvetica', 10)
+                    story.append(PageBreak())  # Start a new page
                 
-                # Clean up the page content
-                if i == 0:  # First part
-                    content = page_content.strip()
-                else:
-                    # Extract content after the page number
-                    parts = page_content.split("---", 1)
-                    if len(parts) > 1:
-                        content = parts[1].strip()
-                    else:
-                        content = parts[0].strip()
-                
-                # Split content into lines
-                lines = content.split('\n')
-                y = height - 40  # Start from top with margin
-                
-                for line in lines:
-                    if y < 40:  # Bottom margin
-                        c.showPage()
-                        if font_registered:
-                            c.setFont(font_name, 10)
-                        else:
-                            c.setFont('Helvetica', 10)
-                        y = height - 40
-                    
-                    # Draw the text
-                    c.drawString(40, y, line)
-                    y -= 14  # Line spacing
+                story.append(Paragraph(escape(content).replace('\n', '<br/>'), style))
             
-            c.save()
+            doc.build(story)
             return output_path
             
         except Exception as nested_e:
@@ -432,6 +610,35 @@ def create_pdf_file(text, output_path):
     
         raise Exception(f"Error creating PDF file: {str(e)}")
 
+def _wrap_to_width(line, font, max_width):
+    """
+    Wrap a line of text so that every piece fits within max_width pixels.
+    
+    The number of characters per piece is estimated from the line's
+    average character width, and any piece that still overflows, e.g.
+    because it holds more wide glyphs than average, is wrapped again.
+    
+    Args:
+        line (str): Line of text without newlines
+        font (ImageFont): Font used to measure the text
+        max_width (int): Maximum width of a piece in pixels
+        
+    Returns:
+        list: Wrapped pieces of the line
+    """
+    line_length = font.getlength(line)
+    if line_length <= max_width or len(line) <= 1:
+        return [line]
+    
+    max_chars = max(1, int(max_width * len(line) / line_length))
+    pieces = []
+    for piece in textwrap.wrap(line, width=max_chars, break_long_words=True):
+        if len(piece) < len(line) and font.getlength(piece) > max_width:
+            pieces.extend(_wrap_to_width(piece, font, max_width))
+        else:
+            pieces.append(piece)
+    return pieces
+
 def create_image_file(text, output_path, format='JPEG'):
     """
     Create an image with the given text.
@@ -448,6 +655,12 @@ def create_image_file(text, output_path, format='JPEG'):
         from PIL import Image, ImageDraw, ImageFont
         import os
         
+        # Favour encoding speed over file size
+        if format == 'PNG':
+            save_options = {'compress_level': 1, 'optimize': False}
+        else:
+            save_options = {'quality': 85, 'optimize': False, 'progressive': False}
+        
         # Create a white background image
         width, height = 1000, 1400
         img = Image.new('RGB', (width, height), color='white')
@@ -455,99 +668,82 @@ def create_image_file(text, output_path, format='JPEG'):
         
         # Try to find a font that supports Japanese characters
         font = None
-        
-        # List of potential fonts that support Japanese
-        potential_fonts = [
-            ('Arial Unicode MS', 'arialuni.ttf'),
-            ('MS Gothic', 'msgothic.ttc'),
-            ('Yu Gothic', 'yugothic.ttf'),
-            ('Meiryo', 'meiryo.ttc'),
-            ('Noto Sans CJK JP', 'NotoSansCJKjp-Regular.otf')
-        ]
-        
-        # Common font locations on Windows
-        font_dirs = [
-            'C:/Windows/Fonts/',
-            os.path.expanduser('~/.fonts/'),
-            os.path.expanduser('~/Library/Fonts/')
-        ]
-        
-        # Try to find a suitable font
-        for font_name, font_file in potential_fonts:
-            for font_dir in font_dirs:
-                font_path = os.path.join(font_dir, font_file)
-                if os.path.exists(font_path):
-                    try:
-                        font = ImageFont.truetype(font_path, 14)
-                        break
-                    except:
-                        continue
-            if font:
-                break
+        cjk_font = _find_cjk_font()
+        if cjk_font:
+            try:
+                font = _load_image_font(cjk_font[1], 14)
+            except:
+                pass
         
         # If no suitable font found, use default
         if not font:
             try:
-                font = ImageFont.truetype("arial.ttf", 14)
+                font = _load_image_font("arial.ttf", 14)
             except:
                 font = ImageFont.load_default()
         
-        # Draw text on the image
-        lines = text.split('\n')
-        y = 20  # Start from top with margin
+        # Lines are 20px apart starting 20px from the top; multiline_text
+        # measures its spacing from the bottom of an 'A'
+        line_height = 20
+        spacing = line_height - draw.textbbox((0, 0), 'A', font=font)[3]
+        lines_per_page = (height - 40) // line_height + 1
         
-        for line in lines:
-            # Handle long lines by wrapping text
-            if font.getlength(line) > width - 40:
-                # Simple word wrapping
-                words = line.split()
-                current_line = ""
-                
-                for word in words:
-                    test_line = current_line + " " + word if current_line else word
-                    if font.getlength(test_line) <= width - 40:
-                        current_line = test_line
-                    else:
-                        # Draw current line and start a new one
-                        draw.text((20, y), current_line, fill='black', font=font)
-                        y += 20
-                        current_line = word
-                        
-                        # Check if we need a new page
-                        if y > height - 20:
-                            # Save current image
-                            img.save(output_path, format=format)
-                            
-                            # Create a new image for the rest of the text
-                            img = Image.new('RGB', (width, height), color='white')
-                            draw = ImageDraw.Draw(img)
-                            y = 20
-                
-                # Draw the last line if there's anything left
-                if current_line:
-                    draw.text((20, y), current_line, fill='black', font=font)
-                    y += 20
-            else:
-                # Draw the line directly
-                draw.text((20, y), line, fill='black', font=font)
-                y += 20
+        # Collect the wrapped lines of each page and draw them in one call
+        page_lines = []
+        
+        for line in text.split('\n'):
+            # Handle long lines by wrapping text to the page width
+            page_lines.extend(_wrap_to_width(line, font, width - 40))
             
             # Check if we need a new page
-            if y > height - 20:
+            while len(page_lines) >= lines_per_page:
+                draw.multiline_text(
+                    (20, 20),
+                    '\n'.join(page_lines[:lines_per_page]),
+                    fill='black',
+                    font=font,
+                    spacing=spacing
+                )
+                page_lines = page_lines[lines_per_page:]
+                
                 # Save current image
-                img.save(output_path, format=format)
+                img.save(output_path, format=format, **save_options)
                 
                 # Create a new image for the rest of the text
                 img = Image.new('RGB', (width, height), color='white')
                 draw = ImageDraw.Draw(img)
-                y = 20
+        
+        if page_lines:
+            draw.multiline_text(
+                (20, 20),
+                '\n'.join(page_lines),
+                fill='black',
+                font=font,
+                spacing=spacing
+            )
         
         # Save the image
-        img.save(output_path, format=format)
+        img.save(output_path, format=format, **save_options)
         return output_path
     except Exception as e:
         raise Exception(f"Error creating image file: {str(e)}")
 
+def file_etag(file_path):
+    """
+    Compute an ETag for a file from its contents.
+    
+    Args:
+        file_path (str): Path to the file
+        
+    Returns:
+        str: Hex digest of the file contents
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
 def generate_output_file(text, output_format, output_path):
     """
     Generate an output file in the specified format.
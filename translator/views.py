@@ -1,22 +1,47 @@
+import functools
+import logging
 import os
-import uuid
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
-from django.urls import reverse
+from django.urls import reverse, get_script_prefix
 from django.conf import settings
-from django.http import HttpResponse, Http404
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.http import HttpResponse, HttpResponseRedirect, Http404, FileResponse
+from django.views.decorators.http import condition
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.files.storage import default_storage
 from django.core.files.base import ContentFile
 
-from .models import Document, OCRResult, Translation, OutputFile
+from .models import Document, OCRResult, Translation, OutputFile, ordered_filename, OCR_CLAIM_TIMEOUT
 from .forms import DocumentUploadForm, OCRLanguageForm, TranslationForm, OutputFormatForm
-from .utils import perform_ocr, translate_text, generate_output_file
+from .utils import generate_output_file, file_etag
+from .tasks import run_ocr, run_translate
+
+logger = logging.getLogger(__name__)
+
+@functools.lru_cache(maxsize=None)
+def _url_template(view_name, script_prefix):
+    """Reverse a URL taking one ID once, leaving a {} placeholder for the ID."""
+    head, tail = reverse(view_name, args=[0]).rsplit('/0/', 1)
+    return f'{head}/{{}}/{tail}'
+
+def _redirect_to(view_name, object_id):
+    """Redirect to a URL taking one ID without resolving it each time."""
+    # The script prefix is part of the key so reversed URLs stay correct
+    # when the project is mounted under a sub-path
+    url = _url_template(view_name, get_script_prefix()).format(object_id)
+    return HttpResponseRedirect(url)
 
 def home_view(request):
     """Home page view."""
-    recent_documents = Document.objects.order_by('-uploaded_at')[:5]
+    recent_documents = (
+        Document.objects
+        .only('id', 'title', 'file', 'uploaded_at', 'status')
+        .order_by('-uploaded_at')[:5]
+    )
     context = {
         'recent_documents': recent_documents,
         'view_name': 'home'
@@ -28,9 +53,22 @@ def upload_view(request):
     if request.method == 'POST':
         form = DocumentUploadForm(request.POST, request.FILES)
         if form.is_valid():
-            document = form.save()
+            document = form.save(commit=False)
+            
+            # Point the new document at the stored copy of an identical
+            # upload, so the file is kept once but can still be OCR'd again
+            existing = (
+                Document.objects
+                .filter(content_sha256=document.content_sha256)
+                .only('file')
+                .first()
+            )
+            if existing:
+                document.file = existing.file.name
+            
+            document.save()
             messages.success(request, 'Document uploaded successfully!')
-            return redirect('translator:ocr', document_id=document.id)
+            return _redirect_to('translator:ocr', document.id)
     else:
         form = DocumentUploadForm()
     
@@ -42,42 +80,50 @@ def upload_view(request):
 
 def ocr_view(request, document_id):
     """View for OCR processing."""
-    document = get_object_or_404(Document, id=document_id)
+    # Join the OCR result so the check below needs no extra query
+    document = get_object_or_404(Document.objects.select_related('ocr_result'), id=document_id)
     
     # Check if OCR has already been performed
     if hasattr(document, 'ocr_result'):
         messages.info(request, 'OCR has already been performed on this document.')
-        return redirect('translator:translate', ocr_id=document.ocr_result.id)
+        return _redirect_to('translator:translate', document.ocr_result.id)
+    
+    # Don't start a second OCR run while one is in progress
+    if document.status == Document.Status.PROCESSING and not document.processing_stale:
+        messages.info(request, 'OCR is already in progress for this document.')
+        return _redirect_to('translator:document_detail', document.id)
     
     if request.method == 'POST':
         form = OCRLanguageForm(request.POST)
         if form.is_valid():
+            # Claim the document with a compare-and-set so concurrent
+            # requests cannot start OCR twice. An expired claim can be taken
+            # over, since its run is assumed dead.
+            now = timezone.now()
+            stale = Q(status=Document.Status.PROCESSING) & (
+                Q(processing_started_at__isnull=True)
+                | Q(processing_started_at__lt=now - OCR_CLAIM_TIMEOUT)
+            )
+            claimed = Document.objects.filter(
+                Q(status__in=[Document.Status.PENDING, Document.Status.FAILED]) | stale,
+                pk=document.pk
+            ).update(status=Document.Status.PROCESSING, processing_started_at=now)
+            if not claimed:
+                messages.info(request, 'OCR is already in progress for this document.')
+                return _redirect_to('translator:document_detail', document.id)
+            
+            # Perform OCR in the background; the document page shows progress
             try:
-                # Update document status
-                document.status = 'processing'
-                document.save()
-                
-                # Perform OCR
-                ocr_text = perform_ocr(document.file.path, form.cleaned_data['language'])
-                
-                # Create OCR result
-                ocr_result = OCRResult.objects.create(
-                    document=document,
-                    text=ocr_text,
-                    language=form.cleaned_data['language']
-                )
-                
-                # Update document status
-                document.status = 'completed'
-                document.save()
-                
-                messages.success(request, 'OCR processing completed successfully!')
-                return redirect('translator:translate', ocr_id=ocr_result.id)
+                run_ocr.delay(document.id, form.cleaned_data['language'])
+            except Exception:
+                # Release the document so OCR can be started again
+                Document.objects.filter(pk=document.pk).update(status=Document.Status.FAILED)
+                logger.exception('Could not queue OCR for document %s', document.id)
+                messages.error(request, 'OCR could not be started. Please try again later.')
+                return _redirect_to('translator:document_detail', document.id)
             
-            except Exception as e:
-                document.status = 'failed'
-                document.save()
-                messages.error(request, f'OCR processing failed: {str(e)}')
+            messages.info(request, 'OCR processing has started. Its status is shown below.')
+            return _redirect_to('translator:document_detail', document.id)
     else:
         form = OCRLanguageForm()
     
@@ -90,54 +136,30 @@ def ocr_view(request, document_id):
 
 def translate_view(request, ocr_id):
     """View for translating OCR results."""
-    ocr_result = get_object_or_404(OCRResult, id=ocr_id)
+    ocr_result = get_object_or_404(OCRResult.objects.select_related('document'), id=ocr_id)
     
     if request.method == 'POST':
         form = TranslationForm(request.POST)
         if form.is_valid():
+            # Record the translation as pending so the document page lists it
+            translation = Translation.objects.create(
+                ocr_result=ocr_result,
+                source_language=ocr_result.language,
+                target_language=form.cleaned_data['target_language']
+            )
+            
+            # Translate in the background; the document page shows progress
             try:
-                # Get source language from OCR result
-                source_lang = ocr_result.language
-                target_lang = form.cleaned_data['target_language']
-                
-                # Map Tesseract language codes to DeepL language codes
-                tesseract_to_deepl = {
-                    'eng': 'EN',
-                    'fra': 'FR',
-                    'deu': 'DE',
-                    'spa': 'ES',
-                    'ita': 'IT',
-                    'por': 'PT',
-                    'rus': 'RU',
-                    'jpn': 'JA',
-                    'chi_sim': 'ZH',
-                    'nld': 'NL',
-                    'pol': 'PL',
-                }
-                
-                # Get DeepL source language code
-                deepl_source_lang = tesseract_to_deepl.get(source_lang)
-                
-                # Translate text
-                translated_text = translate_text(
-                    ocr_result.text,
-                    source_lang=deepl_source_lang,
-                    target_lang=target_lang
-                )
-                
-                # Create translation
-                translation = Translation.objects.create(
-                    ocr_result=ocr_result,
-                    text=translated_text,
-                    source_language=source_lang,
-                    target_language=target_lang
-                )
-                
-                messages.success(request, 'Text translated successfully!')
-                return redirect('translator:output_format', translation_id=translation.id)
+                run_translate.delay(translation.id)
+            except Exception:
+                translation.status = Translation.Status.FAILED
+                translation.save(update_fields=['status'])
+                logger.exception('Could not queue translation %s', translation.id)
+                messages.error(request, 'Translation could not be started. Please try again later.')
+                return _redirect_to('translator:document_detail', ocr_result.document_id)
             
-            except Exception as e:
-                messages.error(request, f'Translation failed: {str(e)}')
+            messages.info(request, 'Translation has started. Its status is shown below.')
+            return _redirect_to('translator:document_detail', ocr_result.document_id)
     else:
         form = TranslationForm()
     
@@ -150,7 +172,12 @@ def translate_view(request, ocr_id):
 
 def output_format_view(request, translation_id):
     """View for selecting output format and editing translated text."""
-    translation = get_object_or_404(Translation, id=translation_id)
+    # Only finished translations have text to edit and export
+    translation = get_object_or_404(
+        Translation.objects.select_related('ocr_result__document'),
+        id=translation_id,
+        status=Translation.Status.COMPLETED
+    )
     
     if request.method == 'POST':
         form = OutputFormatForm(request.POST)
@@ -159,36 +186,42 @@ def output_format_view(request, translation_id):
                 output_format = form.cleaned_data['output_format']
                 edited_text = form.cleaned_data['translated_text']
                 
-                # Create output directory if it doesn't exist
+                # The output directory is created at startup by TranslatorConfig
                 output_dir = os.path.join(settings.MEDIA_ROOT, 'outputs')
-                os.makedirs(output_dir, exist_ok=True)
                 
-                # Generate output filename
-                filename = f"{uuid.uuid4()}.{output_format}"
+                # Generate a time-ordered output filename
+                filename = ordered_filename(output_format)
                 output_path = os.path.join(output_dir, filename)
                 
                 # Generate output file with the edited text
                 generate_output_file(edited_text, output_format, output_path)
+                content_etag = file_etag(output_path)
                 
-                # Create output file record
+                # Create output file record and save any edits in one commit
                 relative_path = os.path.join('outputs', filename)
-                output_file = OutputFile.objects.create(
-                    translation=translation,
-                    file=relative_path,
-                    file_type=output_format
-                )
+                text_edited = edited_text != translation.text
+                with transaction.atomic():
+                    output_file = OutputFile.objects.create(
+                        translation=translation,
+                        file=relative_path,
+                        file_type=output_format,
+                        content_etag=content_etag
+                    )
+                    
+                    # Update the translation with the edited text if it's different
+                    if text_edited:
+                        translation.text = edited_text
+                        translation.save(update_fields=['text'])
                 
-                # Update the translation with the edited text if it's different
-                if edited_text != translation.text:
-                    translation.text = edited_text
-                    translation.save()
+                if text_edited:
                     messages.info(request, 'Translation text has been updated with your edits.')
                 
                 messages.success(request, f'{output_format.upper()} file generated successfully!')
-                return redirect('translator:result', output_id=output_file.id)
+                return _redirect_to('translator:result', output_file.id)
             
-            except Exception as e:
-                messages.error(request, f'Output file generation failed: {str(e)}')
+            except Exception:
+                logger.exception('Output file generation failed for translation %s', translation.id)
+                messages.error(request, 'Output file generation failed. Please try again or choose another format.')
     else:
         # Pre-populate the form with the translation text
         form = OutputFormatForm(initial={'translated_text': translation.text})
@@ -202,29 +235,80 @@ def output_format_view(request, translation_id):
 
 def result_view(request, output_id):
     """View for displaying results."""
-    output_file = get_object_or_404(OutputFile, id=output_id)
+    # Load only the columns the result page shows
+    output_file = get_object_or_404(
+        OutputFile.objects
+        .select_related('translation__ocr_result__document')
+        .only(
+            'id',
+            'file_type',
+            'translation__source_language',
+            'translation__target_language',
+            'translation__text',
+            'translation__ocr_result__text',
+            'translation__ocr_result__document__title',
+            'translation__ocr_result__document__file',
+        ),
+        id=output_id
+    )
     context = {
         'output_file': output_file,
         'view_name': 'result'
     }
     return render(request, 'translator/app.html', context)
 
+def _output_etag(request, output_id):
+    """Return the stored ETag of an output file, if any."""
+    etag = OutputFile.objects.filter(id=output_id).values_list('content_etag', flat=True).first()
+    return etag or None
+
+def _output_last_modified(request, output_id):
+    """Return the creation time of an output file, if it exists."""
+    return OutputFile.objects.filter(id=output_id).values_list('created_at', flat=True).first()
+
+@condition(etag_func=_output_etag, last_modified_func=_output_last_modified)
+def download_view(request, output_id):
+    """View for downloading output files."""
+    output_file = get_object_or_404(OutputFile, id=output_id)
+    
+    try:
+        f = output_file.file.open('rb')
+    except FileNotFoundError:
+        raise Http404('Output file not found.')
+    
+    # FileResponse hands the file to the server's wsgi.file_wrapper, which
+    # can send it with sendfile() instead of copying it through Python
+    return FileResponse(f, as_attachment=True, filename=os.path.basename(output_file.file.name))
+
 def document_detail_view(request, document_id):
     """View for document details."""
-    document = get_object_or_404(Document, id=document_id)
+    document = get_object_or_404(
+        Document.objects
+        .select_related('ocr_result')
+        .prefetch_related('ocr_result__translations__output_files'),
+        id=document_id
+    )
+    # Keep reloading while a translation is still running; this reads the
+    # prefetched translations, so it needs no extra query
+    translation_pending = hasattr(document, 'ocr_result') and any(
+        translation.status == Translation.Status.PENDING
+        for translation in document.ocr_result.translations.all()
+    )
     context = {
         'document': document,
+        'translation_pending': translation_pending,
         'view_name': 'document_detail'
     }
     return render(request, 'translator/app.html', context)
 
 def delete_document_view(request, document_id):
     """View for deleting documents."""
-    document = get_object_or_404(Document, id=document_id)
+    # Document.delete() only needs the file to remove it from disk
+    document = get_object_or_404(Document.objects.only('id', 'file'), id=document_id)
     
     if request.method == 'POST':
         document.delete()
         messages.success(request, 'Document deleted successfully!')
         return redirect('translator:home')
     
-    return redirect('translator:document_detail', document_id=document.id)
+    return _redirect_to('translator:document_detail', document.id)